@@ -8,102 +8,355 @@ This module handles browser automation using Selenium.
 """
 
 import os
+import re
+import copy
+import json
 import time
+import queue
+import functools
 import platform
+import threading
 import subprocess
-from typing import Optional
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
 
 from selenium import webdriver
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+# Number of URLs a pooled controller handles before it is recycled
+MAX_USES_PER_INSTANCE = 50
+
+# Seconds to wait for a page's DOM to settle after it loads: SPAs render their
+# content from XHRs after readyState is complete. Capped near the fixed sleeps
+# this replaces, since animated pages never stop mutating
+PAGE_SETTLE_TIMEOUT = 4
+PAGE_QUIET_PERIOD = 0.5
+
+# Seconds to wait for a modal's DOM to settle after clicking its UI element
+MODAL_SETTLE_TIMEOUT = 2
+
+# Seconds a worker waits for an idle pooled controller before giving up
+ACQUIRE_TIMEOUT = 300
+
+# Port Chrome exposes the DevTools Protocol on when shared between controllers
+DEFAULT_DEBUGGING_PORT = 9222
+
+# Resources that carry no text, blocked when block_media is enabled
+_BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp',
+    '*.mp4', '*.woff', '*.woff2', '*.ttf', '*.svg',
+]
+
+# Counts DOM mutations in window.__domGen so an unchanged page can be detected
+_DOM_GENERATION_SCRIPT = """
+if (!window.__domObserver) {
+    window.__domGen = 0;
+    window.__domObserver = new MutationObserver(function () { window.__domGen++; });
+    window.__domObserver.observe(document, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+}
+"""
+
+# Reads the current origin's localStorage and sessionStorage
+_GET_STORAGE_SCRIPT = """
+function dump(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+}
+return {origin: location.origin, local: dump(localStorage), session: dump(sessionStorage)};
+"""
+
+# Seeds the storage read by _GET_STORAGE_SCRIPT into every new document of its
+# origin, before the page's own scripts run; keys the page already has are kept
+_SEED_STORAGE_SCRIPT = """
+(function (storage) {
+    if (location.origin !== storage.origin) {
+        return;
+    }
+    function seed(target, items) {
+        for (var key in items) {
+            if (target.getItem(key) === null) {
+                target.setItem(key, items[key]);
+            }
+        }
+    }
+    try {
+        seed(localStorage, storage.local);
+        seed(sessionStorage, storage.session);
+    } catch (e) {}
+})(%s);
+"""
+
+# Path words of the pages a lost session redirects to
+_LOGIN_PATH_HINTS = frozenset(('login', 'logon', 'signin', 'sso'))
+
+# Separators between the words of a URL path segment
+_PATH_WORD_SEPARATORS = re.compile(r'[-_]+')
+
+# WebDriver cookie fields that CDP's Network.setCookies accepts unchanged
+_CDP_COOKIE_KEYS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite')
+
+# The platform cannot change while we are running
+_SYSTEM = platform.system()
+
+# Standard Chrome/Chromium install locations on macOS
+_BROWSER_PATHS = (
+    # Chrome paths
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    '/Applications/Google Chrome.app',
+    '~/Applications/Google Chrome.app',
+    # Chromium paths
+    '/Applications/Chromium.app/Contents/MacOS/Chromium',
+    '/Applications/Chromium.app',
+    '~/Applications/Chromium.app',
+)
+
+# Whether the browser installation diagnostics have already been printed
+_diagnostics_shown = False
+
+
+@functools.lru_cache(maxsize=1)
+def _discover_browser_binary() -> Tuple[bool, Optional[str]]:
+    """
+    Look for Chrome or Chromium in the standard locations once per process.
+    
+    Returns:
+        Tuple[bool, Optional[str]]: Whether a browser was found, and its path.
+    """
+    for path in _BROWSER_PATHS:
+        expanded_path = os.path.expanduser(path)
+        if os.path.exists(expanded_path):
+            print(f"Found browser at: {expanded_path}")
+            return True, expanded_path
+    return False, None
+
+
+@functools.lru_cache(maxsize=256)
+def _classify(selector: str) -> str:
+    """
+    Classify a selector as XPath or CSS.
+    
+    Args:
+        selector (str): The selector to classify.
+        
+    Returns:
+        str: 'xpath' or 'css'.
+    """
+    return 'xpath' if selector.startswith(('/', '(', './')) else 'css'
+
+
+@functools.lru_cache(maxsize=4)
+def _build_options(headless: bool, remote_debugging_port: Optional[int],
+                   debugger_address: Optional[str], binary_location: Optional[str]) -> Options:
+    """
+    Build the Chrome options for a controller configuration once per process.
+    
+    The result is shared, so callers must copy it before handing it to Selenium.
+    
+    Args:
+        headless (bool): Whether to run in headless mode.
+        remote_debugging_port (Optional[int]): Port to expose the DevTools Protocol on.
+        debugger_address (Optional[str]): Address of a running Chrome to attach to.
+        binary_location (Optional[str]): Browser binary to use instead of the default.
+        
+    Returns:
+        Options: The configured Chrome options.
+    """
+    chrome_options = Options()
+    # Return from driver.get() at DOMContentLoaded; navigate_to waits for readiness
+    chrome_options.page_load_strategy = 'eager'
+    if debugger_address:
+        # Attach to the shared browser; launch arguments do not apply
+        chrome_options.add_experimental_option("debuggerAddress", debugger_address)
+        return chrome_options
+    
+    if headless:
+        chrome_options.add_argument("--headless=new")  # Use the new headless mode
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--no-sandbox")
+    # Keep Chrome's own logging out of the way of every WebDriver command
+    chrome_options.add_argument("--log-level=3")
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    if remote_debugging_port:
+        chrome_options.add_argument(f"--remote-debugging-port={remote_debugging_port}")
+    if binary_location:
+        chrome_options.binary_location = binary_location
+    return chrome_options
+
+
+class _ClickableCssOrXpath:
+    """
+    Expected condition that finds a clickable element by CSS or XPath in one poll.
+    
+    The strategy the selector looks like is tried first, so the usual case costs
+    a single lookup, while the other strategy still shares the same wait budget.
+    """
+    
+    def __init__(self, selector: str):
+        self.selector = selector
+        if _classify(selector) == 'xpath':
+            self.strategies = (By.XPATH, By.CSS_SELECTOR)
+        else:
+            self.strategies = (By.CSS_SELECTOR, By.XPATH)
+    
+    def __call__(self, driver):
+        for by in self.strategies:
+            try:
+                for element in driver.find_elements(by, self.selector):
+                    if element.is_displayed() and element.is_enabled():
+                        return element
+            except (InvalidSelectorException, StaleElementReferenceException):
+                continue
+        return False
+
+
+@functools.lru_cache(maxsize=256)
+def _clickable(selector: str) -> _ClickableCssOrXpath:
+    """
+    Get the cached clickable condition for a selector.
+    
+    Args:
+        selector (str): CSS or XPath selector.
+        
+    Returns:
+        _ClickableCssOrXpath: The condition for the selector.
+    """
+    return _ClickableCssOrXpath(selector)
+
+
+@functools.lru_cache(maxsize=1)
+def _resolved_driver_path() -> Optional[str]:
+    """
+    Locate the manually downloaded ChromeDriver once per process.
+    
+    Returns:
+        Optional[str]: Absolute path to the driver, or None if it is not present.
+    """
+    driver_path = os.path.abspath("drivers/chromedriver-mac-arm64/chromedriver")
+    if os.path.exists(driver_path):
+        return driver_path
+    return None
+
 
 class BrowserController:
     """
     Browser controller class for automating browser interactions.
     """
     
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, remote_debugging_port: Optional[int] = None,
+                 debugger_address: Optional[str] = None, poll_frequency: float = 0.1,
+                 block_media: bool = True):
         """
         Initialize the browser controller.
         
         Args:
             headless (bool): Whether to run in headless mode.
+            remote_debugging_port (Optional[int]): Port to expose the Chrome DevTools
+                Protocol on, so other controllers can share this browser.
+            debugger_address (Optional[str]): Address ("host:port") of a running Chrome
+                to attach to instead of launching a new one.
+            poll_frequency (float): Seconds between polls of explicit waits.
+            block_media (bool): Whether to block images, fonts and video, which are
+                not needed to analyze page text.
         """
+        self.driver = None
+        self.owns_browser = debugger_address is None
+        self.debugger_address = None
+        # Last page source, keyed by (URL, DOM generation)
+        self._source_cache = None
+        # CDP identifier of the script seeding web storage, if any
+        self._storage_script_id = None
+        
         # Check Chrome/Chromium installation on macOS
-        if platform.system() == 'Darwin':
-            browser_paths = [
-                # Chrome paths
-                '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                '/Applications/Google Chrome.app',
-                '~/Applications/Google Chrome.app',
-                # Chromium paths
-                '/Applications/Chromium.app/Contents/MacOS/Chromium',
-                '/Applications/Chromium.app',
-                '~/Applications/Chromium.app',
-            ]
-            
+        browser_found = False
+        browser_path = None
+        if _SYSTEM == 'Darwin':
             # Try to find Chrome or Chromium
-            browser_found = False
-            browser_path = None
-            for path in browser_paths:
-                expanded_path = os.path.expanduser(path)
-                if os.path.exists(expanded_path):
-                    print(f"Found browser at: {expanded_path}")
-                    browser_found = True
-                    browser_path = expanded_path
-                    break
+            browser_found, browser_path = _discover_browser_binary()
             
             if not browser_found:
                 print("Warning: Neither Chrome nor Chromium found in standard locations, browser automation may fail")
             else:
                 print(f"Using browser at: {browser_path}")
 
-        # Set up Chrome options
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless=new")  # Use the new headless mode
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--no-sandbox")
+        if self.owns_browser and remote_debugging_port:
+            self.debugger_address = f"127.0.0.1:{remote_debugging_port}"
         
         # Add option to use Chromium if Chrome is not available
-        if platform.system() == 'Darwin' and browser_found and 'Chromium' in browser_path:
-            chrome_options.binary_location = browser_path
+        binary_location = None
+        if self.owns_browser and browser_found and 'Chromium' in browser_path:
+            binary_location = browser_path
             print("Configured to use Chromium binary")
         
+        # Set up Chrome options. Selenium may write the resolved browser back into
+        # the options it is given, so never pass it the shared instance
+        chrome_options = copy.deepcopy(_build_options(
+            headless, remote_debugging_port, debugger_address, binary_location
+        ))
+        
         # Try to use our manually downloaded ChromeDriver first
         try:
             # Check if we have a manually downloaded ChromeDriver
-            driver_path = os.path.abspath("drivers/chromedriver-mac-arm64/chromedriver")
-            if os.path.exists(driver_path):
+            driver_path = _resolved_driver_path()
+            if driver_path:
                 print(f"Using manually downloaded ChromeDriver at: {driver_path}")
-                service = Service(executable_path=driver_path)
+                service = Service(executable_path=driver_path, log_output=subprocess.DEVNULL,
+                                  service_args=['--silent'])
                 self.driver = webdriver.Chrome(service=service, options=chrome_options)
             else:
                 # Fall back to letting Selenium find the driver
                 print("No manually downloaded ChromeDriver found, letting Selenium find a driver")
-                service = Service()
+                service = Service(log_output=subprocess.DEVNULL, service_args=['--silent'])
                 self.driver = webdriver.Chrome(service=service, options=chrome_options)
                 
-            self.driver.maximize_window()
+            if self.owns_browser:
+                self.driver.maximize_window()
+            else:
+                # Work in a tab of our own so other controllers are not disturbed
+                self.driver.switch_to.new_window('tab')
+            
+            # Tab to return to after closing per-URL tabs
+            self.anchor_handle = self.driver.current_window_handle
             
-            # Set default timeouts
-            self.driver.implicitly_wait(10)
-            self.wait = WebDriverWait(self.driver, 10)
+            self.block_media = block_media
+            self._apply_media_blocking()
+            
+            # Set default timeouts. Implicit waits stack with explicit ones on every
+            # poll, so rely on self.wait alone
+            self.driver.implicitly_wait(0)
+            self.poll_frequency = poll_frequency
+            self.wait = WebDriverWait(self.driver, 10, poll_frequency=poll_frequency)
             
         except Exception as e:
+            global _diagnostics_shown
+            
             # More detailed error reporting
             print(f"Error initializing Chrome driver: {str(e)}")
-            print(f"Platform: {platform.system()}, Machine: {platform.machine()}")
+            print(f"Platform: {_SYSTEM}, Machine: {platform.machine()}")
             
-            # Check if Chrome or Chromium is installed on macOS
-            if platform.system() == 'Darwin':
+            # Check if Chrome or Chromium is installed on macOS, once per process
+            if _SYSTEM == 'Darwin' and not _diagnostics_shown:
+                _diagnostics_shown = True
                 try:
                     # Check for Chrome
                     result = subprocess.run(['which', 'google-chrome'], capture_output=True, text=True)
@@ -125,46 +378,193 @@ class BrowserController:
             
             raise
     
-    def navigate_to(self, url: str) -> None:
+    def _apply_media_blocking(self) -> None:
+        """
+        Block media downloads in the current tab if block_media is enabled.
+        
+        CDP network settings apply to a single tab, so this is needed for every
+        tab the controller opens.
+        """
+        if self.block_media:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': _BLOCKED_URL_PATTERNS})
+    
+    def navigate_to(self, url: str, wait_for: Optional[str] = None) -> None:
         """
         Navigate to a URL.
         
         Args:
             url (str): The URL to navigate to.
+            wait_for (Optional[str]): CSS selector of an element to wait for
+                once the document is ready.
+                
+        Raises:
+            TimeoutException: If the wait_for element does not appear in time.
         """
+        self._source_cache = None
         self.driver.get(url)
         
-        # Wait for the page to load
-        time.sleep(2)
+        # Wait for the page to load. driver.get already returned once the DOM
+        # was parsed, so a page still loading after the timeout is used as is
+        try:
+            self.wait_for_ready()
+        except TimeoutException:
+            print(f"Warning: Page did not finish loading in time, continuing: {url}")
+        
+        # Track DOM mutations on the new document so get_page_source can reuse
+        # its last result while nothing has changed
+        self.driver.execute_script(_DOM_GENERATION_SCRIPT)
+        
+        # Wait for the requested element; without it the page is not the one
+        # the caller asked for, so the timeout is raised
+        if wait_for:
+            WebDriverWait(self.driver, 10, poll_frequency=self.poll_frequency).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, wait_for)))
+    
+    def wait_for_ready(self, timeout: float = 10, selector: Optional[str] = None) -> None:
+        """
+        Wait until the document has finished loading.
+        
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+            selector (Optional[str]): CSS selector of an element to wait for as well.
+            
+        Raises:
+            TimeoutException: If the page is not ready within the timeout.
+        """
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency)
+        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+        if selector:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+    
+    def wait_for_dom_settled(self, timeout: float = 10, quiet_period: float = 0.3) -> None:
+        """
+        Wait until the DOM has stopped changing, e.g. while a modal opens.
+        
+        Gives up quietly after the timeout, and returns at once on documents not
+        loaded through navigate_to, which have no mutation counter.
+        
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+            quiet_period (float): Seconds without mutations that count as settled.
+        """
+        last = {'generation': None, 'since': time.monotonic()}
+        
+        def settled(driver):
+            generation = driver.execute_script("return window.__domGen")
+            if generation is None:
+                return True
+            now = time.monotonic()
+            if generation != last['generation']:
+                last['generation'], last['since'] = generation, now
+                return False
+            return now - last['since'] >= quiet_period
+        
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(settled)
+        except TimeoutException:
+            pass
+    
+    def navigate_in_new_tab(self, url: str, wait_for: Optional[str] = None) -> None:
+        """
+        Open a new tab and navigate to a URL in it.
+        
+        Args:
+            url (str): The URL to navigate to.
+            wait_for (Optional[str]): CSS selector of an element to wait for
+                once the document is ready.
+        """
+        self.driver.switch_to.new_window('tab')
+        self._apply_media_blocking()
+        self.navigate_to(url, wait_for)
+    
+    def close_current_tab(self) -> None:
+        """
+        Close the current tab and switch back to the controller's anchor tab.
+        """
+        self._source_cache = None
+        if self.driver.current_window_handle != self.anchor_handle:
+            self.driver.close()
+        self.driver.switch_to.window(self.anchor_handle)
+    
+    @contextmanager
+    def tab(self, url: str, wait_for: Optional[str] = None) -> Iterator['BrowserController']:
+        """
+        Open a URL in a fresh tab for the duration of a with block.
+        
+        Args:
+            url (str): The URL to navigate to.
+            wait_for (Optional[str]): CSS selector of an element to wait for
+                once the document is ready.
+            
+        Yields:
+            BrowserController: This controller, switched to the new tab.
+        """
+        try:
+            self.navigate_in_new_tab(url, wait_for)
+            yield self
+        finally:
+            self.close_current_tab()
+    
+    def add_cookies(self, cookies: List[Dict[str, Any]]) -> None:
+        """
+        Add cookies, e.g. from another controller's driver.get_cookies().
+        
+        Unlike driver.add_cookie, this does not require being on the cookie's domain.
+        
+        Args:
+            cookies (List[Dict[str, Any]]): Cookies in WebDriver format.
+        """
+        params = []
+        for cookie in cookies:
+            param = {key: cookie[key] for key in _CDP_COOKIE_KEYS if key in cookie}
+            if 'expiry' in cookie:
+                param['expires'] = cookie['expiry']
+            params.append(param)
+        self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': params})
+    
+    def get_storage(self) -> Dict[str, Any]:
+        """
+        Get the localStorage and sessionStorage of the current page's origin.
+        
+        Returns:
+            Dict[str, Any]: The origin and the items of both storages.
+        """
+        return self.driver.execute_script(_GET_STORAGE_SCRIPT)
+    
+    def add_storage(self, storage: Dict[str, Any]) -> None:
+        """
+        Seed web storage, e.g. from another controller's get_storage(), into
+        every page of its origin loaded in the current tab from now on.
+        
+        Args:
+            storage (Dict[str, Any]): Storage as returned by get_storage.
+        """
+        if self._storage_script_id is not None:
+            self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument',
+                                        {'identifier': self._storage_script_id})
+        result = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument',
+                                             {'source': _SEED_STORAGE_SCRIPT % json.dumps(storage)})
+        self._storage_script_id = result['identifier']
     
     def click_element(self, selector: str) -> bool:
         """
         Click an element on the page.
         
         Args:
-            selector (str): CSS selector for the element.
+            selector (str): CSS or XPath selector for the element.
             
         Returns:
             bool: True if the element was clicked, False otherwise.
         """
         try:
-            # First, try to find the element by CSS selector
-            element = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-            )
+            # Try CSS and XPath within a single wait, starting with the one the
+            # selector looks like
+            element = self.wait.until(_clickable(selector))
             element.click()
             return True
-        except:
-            try:
-                # If that fails, try XPath
-                element = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
-                element.click()
-                return True
-            except:
-                # If both fail, return False
-                return False
+        except (TimeoutException, WebDriverException):
+            return False
     
     def get_page_source(self) -> str:
         """
@@ -173,11 +573,356 @@ class BrowserController:
         Returns:
             str: The page source.
         """
-        return self.driver.page_source
+        # The DOM generation is None on documents not loaded through navigate_to,
+        # which are never cached
+        url, generation = self.driver.execute_script(
+            "return [location.href, window.__domGen === undefined ? null : window.__domGen]"
+        )
+        key = (url, generation)
+        if generation is not None and self._source_cache and self._source_cache[0] == key:
+            return self._source_cache[1]
+        
+        # Serialize the document through CDP rather than WebDriver's getPageSource
+        root = self.driver.execute_cdp_cmd('DOM.getDocument', {'depth': 0})
+        html = self.driver.execute_cdp_cmd(
+            'DOM.getOuterHTML', {'nodeId': root['root']['nodeId']}
+        )['outerHTML']
+        
+        self._source_cache = (key, html) if generation is not None else None
+        return html
+    
+    def close(self) -> None:
+        """
+        Close the browser, or only this controller's tab if the browser is shared.
+        """
+        if not self.driver:
+            return
+        
+        if self.owns_browser:
+            self.driver.quit()
+        else:
+            try:
+                self.driver.close()
+            finally:
+                # Stop our ChromeDriver without quitting the shared browser
+                self.driver.service.stop() 
+
+
+def _close_quietly(controller: BrowserController) -> None:
+    """
+    Close a controller, reporting rather than raising errors from a crashed browser.
+    
+    Args:
+        controller (BrowserController): The controller to close.
+    """
+    try:
+        controller.close()
+    except Exception as e:
+        print(f"Warning: Error closing browser: {str(e)}")
+
+
+class BrowserPool:
+    """
+    Pool of pre-warmed browser controllers shared between worker threads.
+    """
+    
+    def __init__(self, size: int = 4, headless: bool = False, shared: bool = False):
+        """
+        Initialize the pool and start all browsers up front.
+        
+        Args:
+            size (int): Number of browser controllers to keep in the pool.
+            headless (bool): Whether to run the browsers in headless mode.
+            shared (bool): Whether all controllers should work in tabs of a single
+                Chrome instance over the DevTools Protocol instead of one browser each.
+        """
+        self.size = size
+        self.headless = headless
+        self.shared = shared
+        self._host = None
+        self._idle = queue.Queue()
+        self._uses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        
+        try:
+            if shared:
+                self._host = BrowserController(
+                    headless=headless, remote_debugging_port=DEFAULT_DEBUGGING_PORT
+                )
+            for _ in range(size):
+                self._add(self._spawn())
+        except Exception:
+            self.close()
+            raise
+    
+    def __enter__(self) -> 'BrowserPool':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _spawn(self) -> BrowserController:
+        """
+        Create a new controller, attached to the shared browser if there is one.
+        
+        Returns:
+            BrowserController: The new controller.
+        """
+        if self._host:
+            return BrowserController(debugger_address=self._host.debugger_address)
+        return BrowserController(headless=self.headless)
+    
+    def _add(self, controller: BrowserController) -> None:
+        """
+        Register a controller with the pool and mark it as idle.
+        
+        Args:
+            controller (BrowserController): The controller to add.
+        """
+        with self._lock:
+            self._uses[id(controller)] = 0
+        self._idle.put(controller)
+    
+    def _replace(self, controller: BrowserController) -> None:
+        """
+        Close a controller and add a fresh one in its place.
+        
+        A failed replacement is reported and leaves the pool one controller
+        smaller; the pool is closed once no controllers are left.
+        
+        Args:
+            controller (BrowserController): The controller to replace.
+        """
+        _close_quietly(controller)
+        
+        try:
+            self._add(self._spawn())
+        except Exception as e:
+            print(f"Warning: Could not start a replacement browser: {str(e)}")
+            with self._lock:
+                empty = not self._uses
+            if empty:
+                print("Warning: No browsers left in the pool, closing it")
+                self.close()
+    
+    @contextmanager
+    def acquire(self, timeout: float = ACQUIRE_TIMEOUT) -> Iterator[BrowserController]:
+        """
+        Borrow a controller from the pool for the duration of a with block.
+        
+        Args:
+            timeout (float): Maximum number of seconds to wait for an idle controller.
+            
+        Yields:
+            BrowserController: An idle browser controller.
+            
+        Raises:
+            RuntimeError: If the pool is closed or no controller becomes idle
+                within the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"No browser became available within {timeout} seconds")
+            try:
+                # Wake up regularly to notice a pool closed in the meantime
+                controller = self._idle.get(timeout=min(1.0, remaining))
+                break
+            except queue.Empty:
+                continue
+        
+        try:
+            yield controller
+        finally:
+            self.release(controller)
+    
+    def release(self, controller: BrowserController) -> None:
+        """
+        Return a controller to the pool, resetting its state first.
+        
+        The controller is replaced by a fresh one once it has been used
+        MAX_USES_PER_INSTANCE times.
+        
+        Args:
+            controller (BrowserController): The controller to return.
+        """
+        with self._lock:
+            uses = self._uses.pop(id(controller), 0) + 1
+        
+        if self._closed:
+            _close_quietly(controller)
+            return
+        
+        if uses >= MAX_USES_PER_INSTANCE:
+            self._replace(controller)
+            return
+        
+        try:
+            # Cookies are shared by every tab of a shared browser, so keep them
+            if not self.shared:
+                controller.driver.delete_all_cookies()
+            controller.driver.get('about:blank')
+        except Exception as e:
+            # A broken browser is not worth keeping around
+            print(f"Warning: Replacing unhealthy browser: {str(e)}")
+            self._replace(controller)
+            return
+        
+        with self._lock:
+            self._uses[id(controller)] = uses
+        self._idle.put(controller)
     
     def close(self) -> None:
         """
-        Close the browser.
+        Close all idle browsers in the pool.
+        
+        Controllers still checked out are closed when they are released.
         """
-        if self.driver:
-            self.driver.quit() 
\ No newline at end of file
+        self._closed = True
+        while True:
+            try:
+                controller = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            _close_quietly(controller)
+        
+        if self._host:
+            _close_quietly(self._host)
+            self._host = None
+
+
+def _redirected_to_login(requested_url: str, current_url: str) -> bool:
+    """
+    Check whether loading a URL ended up on a login page instead.
+    
+    Args:
+        requested_url (str): The URL that was loaded.
+        current_url (str): The URL the browser ended up on.
+        
+    Returns:
+        bool: True if the browser left the requested host or landed on a
+            login-like path the requested URL does not have.
+    """
+    requested, current = urlparse(requested_url), urlparse(current_url)
+    if (current.hostname or '').removeprefix('www.') != (requested.hostname or '').removeprefix('www.'):
+        return True
+    login_words = _path_words(current.path) & _LOGIN_PATH_HINTS
+    return bool(login_words - _path_words(requested.path))
+
+
+def _path_words(path: str) -> FrozenSet[str]:
+    """
+    Split a URL path into the lowercase words of its segments.
+    
+    Args:
+        path (str): The URL path, e.g. '/auth/sign-in.html'.
+        
+    Returns:
+        FrozenSet[str]: Each word of each segment without its file extension,
+            plus the words joined up (so 'sign-in.html' yields 'sign', 'in'
+            and 'signin').
+    """
+    words = set()
+    for segment in path.lower().split('/'):
+        parts = _PATH_WORD_SEPARATORS.split(segment.split('.', 1)[0])
+        words.update(parts)
+        words.add(''.join(parts))
+    return frozenset(words)
+
+
+def _process_one(pool: BrowserPool, url_item: Dict[str, Any],
+                 cookies: Optional[List[Dict[str, Any]]] = None,
+                 storage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Load one configured URL on a pooled controller and capture its page sources.
+    
+    Args:
+        pool (BrowserPool): The pool to borrow a controller from.
+        url_item (Dict[str, Any]): URL configuration as returned by load_urls.
+        cookies (Optional[List[Dict[str, Any]]]): Cookies to add before loading the
+            page, e.g. the session of a manually logged-in browser.
+        storage (Optional[Dict[str, Any]]): Web storage to seed before loading the
+            page, as returned by BrowserController.get_storage.
+        
+    Returns:
+        Dict[str, Any]: The URL configuration, the page source, the modal source
+            (None if there is no UI element or it could not be clicked) and the
+            error message if the page failed.
+    """
+    result = {'url_item': url_item, 'page_source': None, 'modal_source': None, 'error': None}
+    try:
+        with pool.acquire() as browser:
+            # Pooled browsers lose their cookies on release, so add them every time
+            if cookies:
+                browser.add_cookies(cookies)
+            if storage:
+                browser.add_storage(storage)
+            browser.navigate_to(url_item['url'])
+            
+            # Let client-side rendering finish before capturing the page
+            browser.wait_for_dom_settled(timeout=PAGE_SETTLE_TIMEOUT, quiet_period=PAGE_QUIET_PERIOD)
+            
+            # A page without the session would be analyzed as if it were the UI
+            current_url = browser.driver.current_url
+            if _redirected_to_login(url_item['url'], current_url):
+                result['error'] = f"Redirected to {current_url}, the login session was not kept"
+                return result
+            
+            result['page_source'] = browser.get_page_source()
+            
+            if url_item['ui_element'] and browser.click_element(url_item['ui_element']):
+                # Wait for the modal to finish rendering
+                browser.wait_for_dom_settled(timeout=MODAL_SETTLE_TIMEOUT)
+                result['modal_source'] = browser.get_page_source()
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def process_all(urls: List[Dict[str, Any]], pool_size: int = 4, headless: bool = False,
+                shared: bool = False,
+                cookies: Optional[List[Dict[str, Any]]] = None,
+                storage: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Load all configured URLs in parallel, one pooled browser per worker thread.
+    
+    Results are yielded as soon as each URL finishes, and only a couple of URLs
+    per worker are in flight at a time, so the page sources of the whole crawl
+    are never held at once. The browsers start on the first iteration.
+    
+    Args:
+        urls (List[Dict[str, Any]]): URL configurations as returned by load_urls.
+        pool_size (int): Number of browsers and worker threads.
+        headless (bool): Whether to run the browsers in headless mode.
+        shared (bool): Whether the workers should share one Chrome instance.
+        cookies (Optional[List[Dict[str, Any]]]): Cookies to add to every browser
+            before loading a page.
+        storage (Optional[Dict[str, Any]]): Web storage to seed into every browser
+            before loading a page.
+        
+    Yields:
+        Dict[str, Any]: One result per URL, in the order they finish
+            (see _process_one).
+    """
+    pool_size = max(1, min(pool_size, len(urls)))
+    with BrowserPool(pool_size, headless=headless, shared=shared) as pool, \
+            ThreadPoolExecutor(max_workers=pool_size) as executor:
+        remaining = iter(urls)
+        pending = set()
+        
+        def submit(count: int) -> None:
+            for url_item in islice(remaining, count):
+                pending.add(executor.submit(_process_one, pool, url_item, cookies, storage))
+        
+        # Keep every worker busy with one URL queued behind it
+        submit(2 * pool_size)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                submit(1)
+                yield future.result()
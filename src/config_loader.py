@@ -9,7 +9,32 @@ This module loads the URLs and configurations from the config file.
 
 import os
 import re
-from typing import List, Dict, Any
+import mmap
+from typing import List, Dict, Any, Tuple
+
+# One config line: URL|Page Name|UI Element, or any other non-comment line as 'bad'.
+# [^\S\n] is any whitespace but a newline, as str.strip() removes
+_LINE_RE = re.compile(r'''
+    ^[^\S\n]*
+    (?:
+        (?P<url>[^#|\s][^|\n]*?) [^\S\n]* \| [^\S\n]*
+        (?P<name>[^|\n]*?) [^\S\n]*
+        (?: \| [^\S\n]* (?P<ui_element>[^|\n]*?) [^\S\n]* (?:\|[^\n]*)? )?
+      |
+        (?P<bad>[^#\s][^\n]*?) [^\S\n]*
+    )
+    $
+''', re.M | re.X)
+
+# Parsed URL configurations keyed by (absolute path, mtime, size)
+_URLS_CACHE: Dict[Tuple[str, int, int], List[Dict[str, Any]]] = {}
+
+# AWS credential keys we need to find
+_AWS_CREDENTIAL_KEYS = ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_REGION')
+_REQUIRED_AWS_KEYS = frozenset(_AWS_CREDENTIAL_KEYS)
+# A value ends at \r as well as \n, since the file is scanned without
+# text-mode newline translation
+_CRED_RE = re.compile(f"({'|'.join(_AWS_CREDENTIAL_KEYS)})=([^\r\n]+)".encode())
 
 
 def load_urls(config_file: str) -> List[Dict[str, Any]]:
@@ -27,38 +52,45 @@ def load_urls(config_file: str) -> List[Dict[str, Any]]:
         ValueError: If the config file is malformed.
     """
     # Check if the config file exists
-    if not os.path.exists(config_file):
-        raise FileNotFoundError(f"Config file not found: {config_file}")
+    try:
+        st = os.stat(config_file)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Config file not found: {config_file}") from e
+    
+    # Reuse the previous parse if the file has not changed since
+    cache_key = (os.path.abspath(config_file), st.st_mtime_ns, st.st_size)
+    cached = _URLS_CACHE.get(cache_key)
+    if cached is not None:
+        return [dict(url) for url in cached]
+    
+    # Read the config file, translating \r\n and lone \r line endings to \n
+    # as text mode would
+    try:
+        with open(config_file, 'rb', buffering=1 << 16) as f:
+            text = f.read().decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Config file not found: {config_file}") from e
     
-    # Read the config file
+    # Parse all lines (URL|Page Name|UI Element) in one scan; empty lines and
+    # comments never match
     urls = []
-    with open(config_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue  # Skip empty lines and comments
-                
-            # Parse the line (URL|Page Name|UI Element)
-            parts = line.split('|')
-            if len(parts) < 2:
-                raise ValueError(f"Invalid line in config file: {line}")
-            
-            url = parts[0].strip()
-            name = parts[1].strip() if len(parts) > 1 else url
-            ui_element = parts[2].strip() if len(parts) > 2 else None
-            
-            # Add to the list of URLs
-            urls.append({
-                'url': url,
-                'name': name,
-                'ui_element': ui_element
-            })
+    for match in _LINE_RE.finditer(text):
+        if match['bad'] is not None:
+            raise ValueError(f"Invalid line in config file: {match['bad']}")
+        
+        # Add to the list of URLs
+        urls.append({
+            'url': match['url'],
+            'name': match['name'] or match['url'],
+            'ui_element': match['ui_element'] or None
+        })
     
     # Check if any URLs were loaded
     if not urls:
         raise ValueError("No URLs found in the config file.")
     
-    return urls
+    _URLS_CACHE[cache_key] = urls
+    return [dict(url) for url in urls]
 
 
 def load_aws_credentials(key_file: str = 'API_KEYS.md') -> Dict[str, str]:
@@ -75,33 +107,27 @@ def load_aws_credentials(key_file: str = 'API_KEYS.md') -> Dict[str, str]:
         FileNotFoundError: If the API keys file does not exist.
         ValueError: If required AWS credentials are not found in the file.
     """
-    # Check if the API keys file exists
-    if not os.path.exists(key_file):
-        raise FileNotFoundError(f"API keys file not found: {key_file}")
-    
-    # AWS credential keys we need to find
-    required_keys = [
-        'AWS_ACCESS_KEY_ID',
-        'AWS_SECRET_ACCESS_KEY',
-        'AWS_REGION'
-    ]
-    
     # Dictionary to store the found credentials
     aws_credentials = {}
     
-    # Read the API keys file
-    with open(key_file, 'r') as f:
-        content = f.read()
-        
-        # Look for each credential in the file
-        for key in required_keys:
-            match = re.search(f"{key}=([^\n]+)", content)
-            if match:
-                aws_credentials[key] = match.group(1).strip()
+    # Open the API keys file
+    try:
+        f = open(key_file, 'rb')
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"API keys file not found: {key_file}") from e
+    
+    # Scan the memory-mapped file for all credentials in one pass, decoding
+    # only the matches; the first occurrence of a key wins
+    with f:
+        if os.fstat(f.fileno()).st_size:  # Empty files cannot be mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                for match in _CRED_RE.finditer(content):
+                    key = match.group(1).decode()
+                    aws_credentials.setdefault(key, match.group(2).decode('utf-8').strip())
     
     # Check if all required credentials were found
-    missing_keys = [key for key in required_keys if key not in aws_credentials]
-    if missing_keys:
+    if not _REQUIRED_AWS_KEYS.issubset(aws_credentials):
+        missing_keys = [key for key in _AWS_CREDENTIAL_KEYS if key not in aws_credentials]
         raise ValueError(f"Missing AWS credentials in the API keys file: {', '.join(missing_keys)}")
     
     return aws_credentials 
\ No newline at end of file
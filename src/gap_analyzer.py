@@ -4,26 +4,148 @@
 """
 Gap Analyzer Module for Localization4
 
-This module analyzes pages for localization gaps using AWS Comprehend.
+This module analyzes pages for localization gaps using a local fastText model
+when installed, or AWS Comprehend otherwise.
 """
 
+import os
 import re
+import json
 import boto3
-from typing import Dict, List, Any
-from bs4 import BeautifulSoup
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Tuple
+from lxml import etree
+from lxml import html as lhtml
 
 from config_loader import load_aws_credentials
 
+# Local fastText language identification, preferred over AWS Comprehend when
+# installed (pip install fasttext-langdetect)
+try:
+    from ftlangdetect import detect as local_detect
+except ImportError:
+    local_detect = None
+
+# AWS Comprehend accepts at most 25 documents per batch request
+BATCH_SIZE = 25
+
+# Number of batch requests to keep in flight at once
+MAX_WORKERS = 8
+
+# Characters of a text used to identify its language; enough for any
+# language, and keeps long blobs cheap for Comprehend and the regexes
+MAX_TEXT_LENGTH = 200
+
+# File the detected languages are kept in between runs
+LANG_CACHE_FILE = '.lang_cache.json'
+
+# Sort key for the languages Comprehend detects in a text
+_LANGUAGE_SCORE = itemgetter('Score')
+
+# Parses page sources as UTF-8 bytes, whatever encoding they declare
+_HTML_PARSER = lhtml.HTMLParser(encoding='utf-8')
+
+# Text nodes outside elements that are never shown to the user, selected in C
+_VISIBLE_TEXT_XPATH = etree.XPath(
+    "//text()[normalize-space() and not(ancestor::script or ancestor::style"
+    " or ancestor::noscript or ancestor::template)]",
+    smart_strings=False
+)
+
+# Common code patterns, cheap literal prefixes first
+_CODE_PATTERNS = (
+    r'function\s+\w+\s*\(',
+    r'var\s+\w+\s*=',
+    r'let\s+\w+\s*=',
+    r'const\s+\w+\s*=',
+    r'if\s*\(',
+    r'for\s*\(',
+    r'while\s*\(',
+    r'class\s+\w+',
+    r'\{\s*\w+\s*:',
+    r'\[\s*\w+\s*,',
+    r'<\w+>.*<\/\w+>'
+)
+
+# All code patterns in one regex, so each text is scanned once
+_CODE_RE = re.compile('|'.join(f'(?:{p})' for p in _CODE_PATTERNS))
+
+# Every code pattern needs one of these characters, except 'class\s+\w+'
+_CODE_CHARS = frozenset('(={[<')
+
+# English words that are common in UI and differ from French
+_ENGLISH_WORDS = (
+    'the', 'and', 'with', 'for', 'your', 'you',
+    'is', 'are', 'on', 'in', 'at', 'by', 'from',
+    'settings', 'profile', 'account', 'save', 'cancel',
+    'delete', 'create', 'edit', 'view', 'search',
+    'new', 'dashboard', 'sign', 'out', 'login',
+    'logout', 'password', 'username', 'email',
+    'please', 'enter', 'submit', 'notifications',
+    'messages', 'loading', 'error', 'success'
+)
+
+_EN_SET = frozenset(_ENGLISH_WORDS)
+
+# Whole words, so that a token is in _EN_SET exactly when \bword\b would match
+_WORD_RE = re.compile(r'\w+')
+
+
+def _worth_checking(text: str) -> bool:
+    """
+    Cheaply rule out texts that cannot be untranslated English.
+    
+    Args:
+        text (str): The text to check.
+        
+    Returns:
+        bool: False for very short texts, texts that are mostly not letters
+            (numbers, prices, dates) and texts whose letters are mostly non-ASCII.
+    """
+    if len(text) < 3:
+        return False
+    alpha = sum(c.isalpha() for c in text)
+    if alpha < len(text) * 0.5:
+        return False
+    ascii_alpha = sum(c.isalpha() for c in text if c.isascii())
+    return ascii_alpha >= alpha * 0.7
+
 
 class NovaActLiteAnalyzer:
     """
-    Nova Act Lite analyzer class for detecting localization gaps using AWS Comprehend.
+    Nova Act Lite analyzer class for detecting localization gaps using a local
+    fastText model or AWS Comprehend.
     """
     
-    def __init__(self):
+    def __init__(self, cache_file: Optional[str] = LANG_CACHE_FILE):
         """
-        Initialize the AWS Comprehend client for language detection.
+        Initialize the local language detection model, or the AWS Comprehend client
+        if the model is not available.
+        
+        Args:
+            cache_file (Optional[str]): Path of the file detected languages are kept
+                in between runs, or None to keep them in memory only.
         """
+        # Dominant (language code, score) per text, and heuristic results per
+        # lowercased text
+        self.cache_file = cache_file
+        self._lang_cache: Dict[str, Tuple[str, float]] = {}
+        self._english_cache: Dict[str, bool] = {}
+        self._load_cache()
+        
+        # Load the local model once up front (it is downloaded on first use)
+        self.local_detection = False
+        if local_detect is not None:
+            try:
+                local_detect("Loading", low_memory=True)
+                self.local_detection = True
+                self.initialized = False  # AWS Comprehend is not needed
+                return
+            except Exception as e:
+                print(f"Warning: Failed to load local language detection model: {str(e)}")
+        
         # Load AWS credentials
         try:
             aws_credentials = load_aws_credentials()
@@ -31,12 +153,18 @@ class NovaActLiteAnalyzer:
             self.aws_secret_access_key = aws_credentials['AWS_SECRET_ACCESS_KEY']
             self.aws_region = aws_credentials['AWS_REGION']
             
-            # Initialize AWS Comprehend client
+            # Initialize AWS Comprehend client, with a kept-alive connection for
+            # every concurrent batch request and backoff when throttled
+            client_config = Config(
+                max_pool_connections=MAX_WORKERS,
+                retries={'max_attempts': 3, 'mode': 'adaptive'}
+            )
             self.comprehend = boto3.client(
                 'comprehend',
                 aws_access_key_id=self.aws_access_key_id,
                 aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.aws_region
+                region_name=self.aws_region,
+                config=client_config
             )
             self.initialized = True
             
@@ -44,9 +172,37 @@ class NovaActLiteAnalyzer:
             print(f"Warning: Failed to initialize AWS Comprehend: {str(e)}")
             self.initialized = False
     
+    def __del__(self):
+        try:
+            self.save_cache()
+        except Exception:
+            pass
+    
+    def _load_cache(self) -> None:
+        """
+        Load the detected languages saved by a previous run, if any.
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self._lang_cache = {text: tuple(result) for text, result in json.load(f).items()}
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable language cache {self.cache_file}: {str(e)}")
+    
+    def save_cache(self) -> None:
+        """
+        Save the detected languages so later runs can skip them.
+        """
+        if not self.cache_file or not self._lang_cache:
+            return
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(self._lang_cache, f, ensure_ascii=False)
+    
     def analyze_page(self, html: str, location: str) -> List[Dict[str, Any]]:
         """
-        Analyze a page for localization gaps using AWS Comprehend.
+        Analyze a page for localization gaps using the local fastText model or
+        AWS Comprehend.
         
         Args:
             html (str): The HTML content of the page.
@@ -55,83 +211,146 @@ class NovaActLiteAnalyzer:
         Returns:
             List[Dict[str, Any]]: List of localization gaps found.
         """
-        # Parse the HTML
-        soup = BeautifulSoup(html, 'html.parser')
+        return self.analyze_pages([(html, location)])
+    
+    def analyze_pages(self, pages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several pages for localization gaps, sharing Comprehend batches
+        between them and sending the batches concurrently.
         
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.extract()
+        Args:
+            pages (List[Tuple[str, str]]): (HTML content, location) of each page.
+            
+        Returns:
+            List[Dict[str, Any]]: List of localization gaps found, in page order.
+        """
+        # Collect the texts of all pages, remembering where each one came from
+        items = []
+        for html, location in pages:
+            for text in self._extract_texts(html):
+                text = text[:MAX_TEXT_LENGTH]
+                
+                # Skip texts that cannot be English, before any expensive analysis
+                if _worth_checking(text):
+                    items.append((location, text))
         
-        # Get all text elements
-        text_elements = soup.find_all(text=True)
+        if not self.local_detection and not self.initialized:
+            # If no language detection is available, use heuristic method
+            return self._analyze_with_heuristic(items)
         
-        # Filter out empty text elements and non-text elements
-        filtered_elements = []
-        for element in text_elements:
-            text = element.strip()
-            if text and not self._is_code(text):
-                filtered_elements.append(text)
+        # Detect language once for each distinct text not seen before; the
+        # results fan back out to every occurrence below
+        pending = list(dict.fromkeys(text for _, text in items if text not in self._lang_cache))
+        if pending and self.local_detection:
+            self._detect_locally(pending)
+        elif pending:
+            # Send several Comprehend batches at a time
+            batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(batches))) as executor:
+                list(executor.map(self._detect_batch, batches))
         
-        # Detect language for each text element
         gaps = []
-        batch_size = 25  # AWS Comprehend has limits on batch size
-        
-        for i in range(0, len(filtered_elements), batch_size):
-            batch = filtered_elements[i:i+batch_size]
+        for location, text in items:
+            result = self._lang_cache.get(text)
+            if result is None:
+                # Detection failed for this text, fall back to heuristic method
+                gaps.extend(self._analyze_with_heuristic([(location, text)]))
+                continue
             
-            # Skip single character texts and numbers
-            valid_batch = [text for text in batch if len(text) > 1 and not text.isdigit()]
+            # If the dominant language is English (and we're in a French UI)
+            language_code, score = result
+            if language_code == 'en' and score > 0.7:
+                gap = {
+                    'location': location,
+                    'text': text,
+                    'confidence': score
+                }
+                gaps.append(gap)
+        
+        return gaps
+    
+    def _extract_texts(self, html: str) -> List[str]:
+        """
+        Extract the visible, non-code text elements of a page.
+        
+        Args:
+            html (str): The HTML content of the page.
             
-            if not valid_batch:
+        Returns:
+            List[str]: The stripped text elements.
+        """
+        if not html.strip():
+            return []
+        
+        # Parse the HTML and select the visible, non-blank text nodes; markup
+        # without any elements, e.g. only a comment, is an empty document
+        try:
+            tree = lhtml.document_fromstring(html.encode('utf-8'), parser=_HTML_PARSER)
+        except etree.ParserError:
+            return []
+        texts = (text.strip() for text in _VISIBLE_TEXT_XPATH(tree))
+        
+        # Filter out code
+        return [text for text in texts if not self._is_code(text)]
+    
+    def _detect_locally(self, texts: List[str]) -> None:
+        """
+        Detect the language of texts with the local fastText model and store the
+        results in the language cache.
+        
+        Args:
+            texts (List[str]): The texts to detect.
+        """
+        for text in texts:
+            try:
+                # fastText predicts on a single line
+                result = local_detect(text.replace('\n', ' '), low_memory=True)
+            except Exception as e:
+                print(f"Warning: Local language detection error: {str(e)}")
                 continue
-                
-            if self.initialized:
-                # Use AWS Comprehend to detect language
-                try:
-                    response = self.comprehend.batch_detect_dominant_language(
-                        TextList=valid_batch
-                    )
-                    
-                    for j, result in enumerate(response['ResultList']):
-                        text = valid_batch[j]
-                        
-                        # Get the dominant language with the highest score
-                        languages = result['Languages']
-                        dominant_lang = max(languages, key=lambda x: x['Score'])
-                        
-                        # If the dominant language is English (and we're in a French UI)
-                        if dominant_lang['LanguageCode'] == 'en' and dominant_lang['Score'] > 0.7:
-                            confidence = dominant_lang['Score']
-                            gap = {
-                                'location': location,
-                                'text': text,
-                                'confidence': confidence
-                            }
-                            gaps.append(gap)
-                            
-                except Exception as e:
-                    print(f"Warning: AWS Comprehend error: {str(e)}")
-                    # Fall back to heuristic method for this batch
-                    gaps.extend(self._analyze_with_heuristic(valid_batch, location))
-            else:
-                # If AWS is not initialized, use heuristic method
-                gaps.extend(self._analyze_with_heuristic(valid_batch, location))
+            self._lang_cache[text] = (result['lang'], result['score'])
+    
+    def _detect_batch(self, batch: List[str]) -> None:
+        """
+        Detect the dominant language of one batch of texts with AWS Comprehend
+        and store the results in the language cache.
         
-        return gaps
+        Texts are left out of the cache if detection fails for them.
+        
+        Args:
+            batch (List[str]): Up to BATCH_SIZE texts.
+        """
+        try:
+            response = self.comprehend.batch_detect_dominant_language(TextList=batch)
+        except Exception as e:
+            print(f"Warning: AWS Comprehend error: {str(e)}")
+            return
+        
+        for result in response.get('ResultList', []):
+            try:
+                # Results for failed documents are left out, so match them up by index
+                text = batch[result['Index']]
+                
+                # Get the dominant language with the highest score
+                languages = result['Languages']
+                dominant_lang = max(languages, key=_LANGUAGE_SCORE)
+                self._lang_cache[text] = (dominant_lang['LanguageCode'], dominant_lang['Score'])
+            except Exception as e:
+                # Leave the text out of the cache so it falls back to the heuristic
+                print(f"Warning: Unexpected AWS Comprehend result: {str(e)}")
     
-    def _analyze_with_heuristic(self, texts: List[str], location: str) -> List[Dict[str, Any]]:
+    def _analyze_with_heuristic(self, items: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
         """
         Analyze texts using heuristic method as a fallback.
         
         Args:
-            texts (List[str]): List of text elements to analyze.
-            location (str): The location of the texts.
+            items (List[Tuple[str, str]]): (location, text) pairs to analyze.
             
         Returns:
             List[Dict[str, Any]]: List of gaps found.
         """
         gaps = []
-        for text in texts:
+        for location, text in items:
             # Check if the text is likely to be English
             if self._is_likely_english(text):
                 confidence = self._calculate_confidence(text)
@@ -154,26 +373,12 @@ class NovaActLiteAnalyzer:
         Returns:
             bool: True if the text is code, False otherwise.
         """
-        # Check for common code patterns
-        code_patterns = [
-            r'function\s+\w+\s*\(',
-            r'var\s+\w+\s*=',
-            r'let\s+\w+\s*=',
-            r'const\s+\w+\s*=',
-            r'if\s*\(',
-            r'for\s*\(',
-            r'while\s*\(',
-            r'class\s+\w+',
-            r'\{\s*\w+\s*:',
-            r'\[\s*\w+\s*,',
-            r'<\w+>.*<\/\w+>'
-        ]
-        
-        for pattern in code_patterns:
-            if re.search(pattern, text):
-                return True
+        # Most UI text cannot match any pattern; rule it out without the regex
+        if _CODE_CHARS.isdisjoint(text) and 'class' not in text:
+            return False
         
-        return False
+        # Check for common code patterns
+        return _CODE_RE.search(text) is not None
     
     def _is_likely_english(self, text: str) -> bool:
         """
@@ -185,29 +390,17 @@ class NovaActLiteAnalyzer:
         Returns:
             bool: True if the text is likely to be English, False otherwise.
         """
-        # English words that are common in UI and differ from French
-        english_words = [
-            'the', 'and', 'with', 'for', 'your', 'you',
-            'is', 'are', 'on', 'in', 'at', 'by', 'from',
-            'settings', 'profile', 'account', 'save', 'cancel',
-            'delete', 'create', 'edit', 'view', 'search',
-            'new', 'dashboard', 'sign', 'out', 'login',
-            'logout', 'password', 'username', 'email',
-            'please', 'enter', 'submit', 'notifications',
-            'messages', 'loading', 'error', 'success'
-        ]
-        
         # Convert to lowercase for case-insensitive matching
-        text_lower = text.lower()
+        text_lower = text[:MAX_TEXT_LENGTH].lower()
         
-        # Check for common English words
-        for word in english_words:
-            # Match whole words only
-            pattern = r'\b' + re.escape(word) + r'\b'
-            if re.search(pattern, text_lower):
-                return True
+        cached = self._english_cache.get(text_lower)
+        if cached is not None:
+            return cached
         
-        return False
+        # Check for common English words (whole words only), stopping at the first hit
+        is_english = any(m.group() in _EN_SET for m in _WORD_RE.finditer(text_lower))
+        self._english_cache[text_lower] = is_english
+        return is_english
     
     def _calculate_confidence(self, text: str) -> float:
         """
@@ -226,27 +419,15 @@ class NovaActLiteAnalyzer:
         if len(text) > 20:
             confidence += 0.1
         
-        # Adjust based on the number of English words
-        english_word_count = 0
-        english_words = [
-            'the', 'and', 'with', 'for', 'your', 'you',
-            'is', 'are', 'on', 'in', 'at', 'by', 'from',
-            'settings', 'profile', 'account', 'save', 'cancel',
-            'delete', 'create', 'edit', 'view', 'search',
-            'new', 'dashboard', 'sign', 'out', 'login',
-            'logout', 'password', 'username', 'email',
-            'please', 'enter', 'submit', 'notifications',
-            'messages', 'loading', 'error', 'success'
-        ]
-        
-        text_lower = text.lower()
-        for word in english_words:
-            pattern = r'\b' + re.escape(word) + r'\b'
-            if re.search(pattern, text_lower):
-                english_word_count += 1
-        
-        if english_word_count > 2:
-            confidence += 0.1
+        # Adjust based on the number of distinct English words (three is enough)
+        english_words = set()
+        for match in _WORD_RE.finditer(text.lower()):
+            word = match.group()
+            if word in _EN_SET:
+                english_words.add(word)
+                if len(english_words) > 2:
+                    confidence += 0.1
+                    break
         
         # Cap confidence at 0.95
         return min(confidence, 0.95) 
\ No newline at end of file
@@ -10,20 +10,22 @@ which detects localization gaps in the Guesty PMS UI.
 
 import os
 import sys
-import time
 import webbrowser
 from datetime import datetime
 
 from colorama import Fore, Style, init
 
-from browser_controller import BrowserController
+from browser_controller import BrowserController, process_all
 from config_loader import load_urls
 from gap_analyzer import NovaActLiteAnalyzer
-from report_generator import generate_html_report, generate_csv_report
+from report_generator import CsvReportWriter, generate_html_report, read_csv_report
 
 # Initialize colorama for colored terminal output
 init()
 
+# Number of browsers scanning URLs in parallel
+SCAN_WORKERS = 4
+
 def print_banner():
     """
     Print a welcome banner for the tool.
@@ -56,7 +58,8 @@ def main():
     # Initialize the browser controller
     try:
         print(f"{Fore.LIGHTBLUE_EX}Initializing browser controller...{Style.RESET_ALL}")
-        browser = BrowserController()
+        # The user logs in here, so keep images and icon fonts
+        browser = BrowserController(block_media=False)
         print(f"{Fore.GREEN}✓ Browser controller initialized.{Style.RESET_ALL}")
     except Exception as e:
         print(f"{Fore.RED}Error initializing browser controller: {str(e)}{Style.RESET_ALL}")
@@ -96,66 +99,84 @@ def main():
     # Wait for user input
     input(f"\n{Fore.WHITE}Press Enter to start scanning...{Style.RESET_ALL}")
     
-    # Scan each URL for localization gaps
-    all_gaps = []
-    for i, url_item in enumerate(urls, 1):
-        url = url_item['url']
-        page_name = url_item['name']
-        ui_element = url_item['ui_element']
-        
-        print(f"\n{Fore.LIGHTBLUE_EX}[{i}/{len(urls)}] Scanning {page_name} ({url}){Style.RESET_ALL}")
-        
-        try:
-            # Navigate to the URL
-            browser.navigate_to(url)
-            time.sleep(2)  # Wait for page to load
+    # Reuse the manual login in the scanning browsers, then close this one.
+    # SPAs often keep their auth token and UI language in web storage
+    cookies = browser.driver.get_cookies()
+    try:
+        storage = browser.get_storage()
+    except Exception as e:
+        print(f"{Fore.YELLOW}Warning: Could not copy the page storage: {str(e)}{Style.RESET_ALL}")
+        storage = None
+    browser.close()
+    
+    # Generate timestamp for report filenames
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    html_report_path = f"reports/localization_report_{timestamp}.html"
+    csv_report_path = f"reports/localization_report_{timestamp}.csv"
+    
+    # Write gaps to the CSV report as each URL is analyzed, so a crash during
+    # the scan keeps what was found so far
+    try:
+        csv_report = CsvReportWriter(csv_report_path)
+    except Exception as e:
+        print(f"{Fore.RED}Error creating CSV report: {str(e)}{Style.RESET_ALL}")
+        sys.exit(1)
+    
+    # Load every URL in parallel browsers and analyze each one as it finishes
+    print(f"\n{Fore.LIGHTBLUE_EX}Scanning {len(urls)} URLs with up to {SCAN_WORKERS} browsers...{Style.RESET_ALL}")
+    try:
+        results = process_all(urls, pool_size=SCAN_WORKERS, cookies=cookies, storage=storage)
+        for i, result in enumerate(results, 1):
+            url_item = result['url_item']
+            url = url_item['url']
+            page_name = url_item['name']
+            ui_element = url_item['ui_element']
+            
+            print(f"\n{Fore.LIGHTBLUE_EX}[{i}/{len(urls)}] Scanned {page_name} ({url}){Style.RESET_ALL}")
             
-            # Analyze the main page
-            print(f"{Fore.WHITE}Analyzing main page...{Style.RESET_ALL}")
-            main_page_gaps = analyzer.analyze_page(browser.get_page_source(), f"{page_name}")
-            all_gaps.extend(main_page_gaps)
+            if result['error']:
+                print(f"{Fore.RED}Error scanning {page_name}: {result['error']}{Style.RESET_ALL}")
+                continue
             
-            # Click the UI element if specified
-            if ui_element:
-                print(f"{Fore.WHITE}Clicking UI element: {ui_element}{Style.RESET_ALL}")
-                browser.click_element(ui_element)
-                time.sleep(2)  # Wait for modal to open
+            try:
+                # Analyze the main page and the modal together
+                pages = [(result['page_source'], f"{page_name}")]
+                if ui_element:
+                    if result['modal_source'] is None:
+                        print(f"{Fore.YELLOW}Could not click UI element: {ui_element}{Style.RESET_ALL}")
+                    else:
+                        pages.append((result['modal_source'], f"{page_name} > Modal"))
                 
-                # Analyze the modal
-                print(f"{Fore.WHITE}Analyzing modal...{Style.RESET_ALL}")
-                modal_gaps = analyzer.analyze_page(browser.get_page_source(), f"{page_name} > Modal")
-                all_gaps.extend(modal_gaps)
+                print(f"{Fore.WHITE}Analyzing {'main page and modal' if len(pages) > 1 else 'main page'}...{Style.RESET_ALL}")
+                csv_report.write_gaps(analyzer.analyze_pages(pages))
+                
+                print(f"{Fore.GREEN}✓ Finished scanning {page_name}.{Style.RESET_ALL}")
             
-            print(f"{Fore.GREEN}✓ Finished scanning {page_name}.{Style.RESET_ALL}")
-        
-        except Exception as e:
-            print(f"{Fore.RED}Error scanning {page_name}: {str(e)}{Style.RESET_ALL}")
-            continue
+            except Exception as e:
+                print(f"{Fore.RED}Error scanning {page_name}: {str(e)}{Style.RESET_ALL}")
+                continue
+    except Exception as e:
+        # Includes failing to start the scanning browsers; report what was found
+        print(f"{Fore.RED}Error during scanning: {str(e)}{Style.RESET_ALL}")
+    finally:
+        csv_report.close()
     
-    # Close the browser
-    browser.close()
+    print(f"\n{Fore.GREEN}✓ CSV report generated: {csv_report_path}{Style.RESET_ALL}")
     
-    # Generate timestamp for report filenames
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Keep detected languages for the next run
+    try:
+        analyzer.save_cache()
+    except Exception as e:
+        print(f"{Fore.YELLOW}Warning: Could not save language cache: {str(e)}{Style.RESET_ALL}")
     
-    # Generate HTML report
-    html_report_path = f"reports/localization_report_{timestamp}.html"
+    # Generate HTML report from the gaps in the CSV report
     try:
         print(f"\n{Fore.LIGHTBLUE_EX}Generating HTML report...{Style.RESET_ALL}")
-        generate_html_report(all_gaps, html_report_path)
+        generate_html_report(read_csv_report(csv_report_path), html_report_path)
         print(f"{Fore.GREEN}✓ HTML report generated: {html_report_path}{Style.RESET_ALL}")
     except Exception as e:
         print(f"{Fore.RED}Error generating HTML report: {str(e)}{Style.RESET_ALL}")
     
-    # Generate CSV report
-    csv_report_path = f"reports/localization_report_{timestamp}.csv"
-    try:
-        print(f"\n{Fore.LIGHTBLUE_EX}Generating CSV report...{Style.RESET_ALL}")
-        generate_csv_report(all_gaps, csv_report_path)
-        print(f"{Fore.GREEN}✓ CSV report generated: {csv_report_path}{Style.RESET_ALL}")
-    except Exception as e:
-        print(f"{Fore.RED}Error generating CSV report: {str(e)}{Style.RESET_ALL}")
-    
     # Open the HTML report
     try:
         print(f"\n{Fore.LIGHTBLUE_EX}Opening HTML report...{Style.RESET_ALL}")
@@ -165,7 +186,7 @@ def main():
         print(f"{Fore.RED}Error opening HTML report: {str(e)}{Style.RESET_ALL}")
     
     print(f"\n{Fore.LIGHTGREEN_EX}Localization gap detection completed!{Style.RESET_ALL}")
-    print(f"{Fore.WHITE}Found {len(all_gaps)} potential localization gaps.{Style.RESET_ALL}")
+    print(f"{Fore.WHITE}Found {csv_report.count} potential localization gaps.{Style.RESET_ALL}")
     print(f"{Fore.WHITE}Check the HTML and CSV reports for details.{Style.RESET_ALL}")
 
 if __name__ == "__main__":
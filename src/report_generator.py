@@ -9,51 +9,39 @@ This module generates HTML and CSV reports for localization gaps.
 
 import os
 import csv
+import gzip
+import json
+from html import escape
+from collections import Counter
 from datetime import datetime
-from typing import Dict, List, Any
+from operator import itemgetter
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 
 
-def generate_html_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
-    """
-    Generate an HTML report for localization gaps.
-    
-    Args:
-        gaps (List[Dict[str, Any]]): List of localization gaps.
-        output_file (str): Path to the output file.
-    """
-    # Create the directory if it doesn't exist
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    # Count gaps by location and confidence
-    location_counts = {}
-    confidence_ranges = {
-        '90-100%': 0,
-        '80-90%': 0,
-        '70-80%': 0,
-        '<70%': 0
-    }
-    
-    for gap in gaps:
-        location = gap['location']
-        confidence = gap['confidence']
-        
-        # Update location counts
-        if location not in location_counts:
-            location_counts[location] = 0
-        location_counts[location] += 1
-        
-        # Update confidence ranges
-        if confidence >= 0.9:
-            confidence_ranges['90-100%'] += 1
-        elif confidence >= 0.8:
-            confidence_ranges['80-90%'] += 1
-        elif confidence >= 0.7:
-            confidence_ranges['70-80%'] += 1
-        else:
-            confidence_ranges['<70%'] += 1
-    
-    # Generate the HTML report
-    html = f"""
+# Rows of the HTML report table rendered as markup; the rest are embedded as
+# JSON and shown a page at a time by the pager script
+PAGE_SIZE = 100
+
+# Buffer size of the report files, so large reports take few write calls
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Report directories already created by this process
+_dir_cache = set()
+
+# Sort keys for the gaps of a report, as dicts and as (location, text,
+# confidence) rows
+_CONFIDENCE = itemgetter('confidence')
+_LOCATION = itemgetter('location')
+_TEXT = itemgetter('text')
+_ROW_LOCATION = itemgetter(0)
+_ROW_CONFIDENCE = itemgetter(2)
+
+# Confidence ranges of the report, highest first, and the CSS class of each
+_BUCKET_NAMES = ('90-100%', '80-90%', '70-80%', '<70%')
+_BUCKET_CLASSES = ('high', 'medium', 'low', 'very-low')
+
+# Markup of the HTML report before the body, including the stylesheet
+_REPORT_HEAD = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -61,55 +49,55 @@ def generate_html_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Localization Gap Report</title>
         <style>
-            body {{
+            body {
                 font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                 margin: 0;
                 padding: 0;
                 background-color: #f5f5f5;
                 color: #333;
-            }}
-            .container {{
+            }
+            .container {
                 max-width: 1200px;
                 margin: 0 auto;
                 padding: 20px;
-            }}
-            .header {{
+            }
+            .header {
                 background-color: #1e5631;
                 color: white;
                 padding: 20px;
                 border-radius: 5px;
                 margin-bottom: 20px;
                 text-align: center;
-            }}
-            .summary {{
+            }
+            .summary {
                 display: flex;
                 justify-content: space-between;
                 margin-bottom: 20px;
-            }}
-            .summary-box {{
+            }
+            .summary-box {
                 background-color: #fff;
                 border-radius: 5px;
                 box-shadow: 0 2px 5px rgba(0,0,0,0.1);
                 padding: 15px;
                 flex: 1;
                 margin: 0 10px;
-            }}
-            .summary-box h3 {{
+            }
+            .summary-box h3 {
                 margin-top: 0;
                 color: #1e5631;
-            }}
-            .chart {{
+            }
+            .chart {
                 background-color: #fff;
                 border-radius: 5px;
                 box-shadow: 0 2px 5px rgba(0,0,0,0.1);
                 padding: 15px;
                 margin-bottom: 20px;
-            }}
-            .chart h3 {{
+            }
+            .chart h3 {
                 margin-top: 0;
                 color: #1e5631;
-            }}
-            .table {{
+            }
+            .table {
                 width: 100%;
                 border-collapse: collapse;
                 margin-bottom: 20px;
@@ -117,24 +105,24 @@ def generate_html_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
                 border-radius: 5px;
                 box-shadow: 0 2px 5px rgba(0,0,0,0.1);
                 overflow: hidden;
-            }}
-            .table th {{
+            }
+            .table th {
                 background-color: #1e5631;
                 color: white;
                 padding: 12px 15px;
                 text-align: left;
-            }}
-            .table td {{
+            }
+            .table td {
                 padding: 12px 15px;
                 border-bottom: 1px solid #ddd;
-            }}
-            .table tr:last-child td {{
+            }
+            .table tr:last-child td {
                 border-bottom: none;
-            }}
-            .table tr:hover {{
+            }
+            .table tr:hover {
                 background-color: #f5f5f5;
-            }}
-            .confidence {{
+            }
+            .confidence {
                 padding: 5px 10px;
                 border-radius: 20px;
                 font-weight: bold;
@@ -142,25 +130,25 @@ def generate_html_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
                 display: inline-block;
                 width: 60px;
                 text-align: center;
-            }}
-            .high {{
+            }
+            .high {
                 background-color: #1e5631;
-            }}
-            .medium {{
+            }
+            .medium {
                 background-color: #4d8c57;
-            }}
-            .low {{
+            }
+            .low {
                 background-color: #84bf8e;
-            }}
-            .very-low {{
+            }
+            .very-low {
                 background-color: #ff9800;
-            }}
-            .pagination {{
+            }
+            .pagination {
                 display: flex;
                 justify-content: center;
                 margin-top: 20px;
-            }}
-            .pagination button {{
+            }
+            .pagination button {
                 background-color: #1e5631;
                 color: white;
                 border: none;
@@ -168,70 +156,244 @@ def generate_html_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
                 margin: 0 5px;
                 border-radius: 5px;
                 cursor: pointer;
-            }}
-            .pagination button:hover {{
+            }
+            .pagination button:hover {
                 background-color: #4d8c57;
-            }}
-            .pagination button:disabled {{
+            }
+            .pagination button:disabled {
                 background-color: #ccc;
                 cursor: not-allowed;
-            }}
-            .page-info {{
+            }
+            .page-info {
                 margin: 0 10px;
                 line-height: 32px;
-            }}
-            .donut-chart {{
+            }
+            .donut-chart {
                 width: 200px;
                 height: 200px;
                 margin: 0 auto;
                 position: relative;
-            }}
-            .bar-chart {{
-                display: flex;
-                align-items: flex-end;
-                height: 200px;
-                justify-content: space-around;
-                padding: 0 20px;
-            }}
-            .bar {{
-                width: 40px;
-                background-color: #84bf8e;
-                margin: 0 10px;
-                position: relative;
-            }}
-            .bar-label {{
-                position: absolute;
-                bottom: -25px;
-                text-align: center;
+            }
+            .bar-chart {
+                display: block;
                 width: 100%;
+                height: 245px;
+            }
+            .bar-chart rect {
+                fill: #84bf8e;
+            }
+            .bar-chart text {
+                text-anchor: middle;
+                fill: #333;
+            }
+            .bar-chart .bar-label {
                 font-size: 12px;
-            }}
-            .bar-value {{
-                position: absolute;
-                top: -20px;
-                text-align: center;
-                width: 100%;
-            }}
-            footer {{
+            }
+            footer {
                 text-align: center;
                 margin-top: 30px;
                 padding: 20px;
                 color: #666;
                 font-size: 14px;
-            }}
+            }
         </style>
     </head>
+"""
+
+# Markup of the HTML report after the first page of table rows
+_TABLE_END = """
+                </tbody>
+            </table>
+            """
+
+# Page controls of the HTML report, before the embedded rows of later pages
+_PAGER_START = """
+            <div class="pagination">
+                <button id="prev-page" disabled>Previous</button>
+                <span class="page-info" id="page-info"></span>
+                <button id="next-page">Next</button>
+            </div>
+            <script id="gaps-data" type="application/json">"""
+
+# Script showing the embedded rows of the HTML report a page at a time
+_PAGER_END = """</script>
+            <script>
+            (function () {
+                var data = JSON.parse(document.getElementById('gaps-data').textContent);
+                var body = document.querySelector('.table tbody');
+                var firstPage = body.innerHTML;
+                var pages = 1 + Math.ceil(data.rows.length / data.pageSize);
+                var prev = document.getElementById('prev-page');
+                var next = document.getElementById('next-page');
+                var info = document.getElementById('page-info');
+                var page = 1;
+                
+                function addCell(row, text) {
+                    row.insertCell().textContent = text;
+                }
+                
+                function show(number) {
+                    page = number;
+                    if (page === 1) {
+                        body.innerHTML = firstPage;
+                    } else {
+                        body.textContent = '';
+                        var start = (page - 2) * data.pageSize;
+                        data.rows.slice(start, start + data.pageSize).forEach(function (gap) {
+                            var row = body.insertRow();
+                            addCell(row, gap[0]);
+                            addCell(row, gap[1]);
+                            var badge = document.createElement('span');
+                            badge.className = 'confidence ' + data.classes[gap[3]];
+                            badge.textContent = gap[2] + '%';
+                            row.insertCell().appendChild(badge);
+                        });
+                    }
+                    info.textContent = 'Page ' + page + ' of ' + pages;
+                    prev.disabled = page === 1;
+                    next.disabled = page === pages;
+                }
+                
+                prev.addEventListener('click', function () { show(page - 1); });
+                next.addEventListener('click', function () { show(page + 1); });
+                show(1);
+            })();
+            </script>
+            """
+
+# Markup of the HTML report after the table
+_REPORT_END = """
+            <footer>
+                <p>Localization4 - Localization Gap Detection Tool</p>
+                <p>Generated using Nova Act Lite</p>
+            </footer>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def _ensure_directory(output_file: str) -> None:
+    """
+    Create the directory of a report file, once per process.
+    
+    Args:
+        output_file (str): Path to the output file.
+    """
+    directory = os.path.dirname(output_file)
+    if directory and directory not in _dir_cache:
+        os.makedirs(directory, exist_ok=True)
+        _dir_cache.add(directory)
+
+
+def _confidence_bucket(confidence: float) -> int:
+    """
+    Find the confidence range of a gap.
+    
+    Args:
+        confidence (float): The confidence score (0.0 to 1.0).
+        
+    Returns:
+        int: Index of the range in _BUCKET_NAMES and _BUCKET_CLASSES.
+    """
+    return 0 if confidence >= 0.9 else 1 if confidence >= 0.8 else 2 if confidence >= 0.7 else 3
+
+
+def _svg_bars(labels: List[str], values: List[int], max_value: Optional[int] = None) -> str:
+    """
+    Draw a bar chart as inline SVG.
+    
+    Args:
+        labels (List[str]): The escaped label of each bar.
+        values (List[int]): The value of each bar.
+        max_value (Optional[int]): The value of a full-height bar, by default
+            the largest of the values.
+        
+    Returns:
+        str: The SVG markup.
+    """
+    if max_value is None:
+        max_value = max(values, default=0)
+    scale = 200 / max(1, max_value)
+    
+    # Each bar gets a 100-unit slot, with its value above it and its label below
+    parts = [f'<svg class="bar-chart" viewBox="0 0 {max(1, len(values)) * 100} 245">']
+    append = parts.append
+    for index, (label, value) in enumerate(zip(labels, values)):
+        center = index * 100 + 50
+        height = value * scale
+        append(f'<rect x="{center - 20}" y="{220 - height:.1f}" width="40" height="{height:.1f}"/>'
+               f'<text x="{center}" y="{214 - height:.1f}">{value}</text>'
+               f'<text class="bar-label" x="{center}" y="240">{label}</text>')
+    append('</svg>')
+    return ''.join(parts)
+
+
+def generate_html_report(gaps: Union[List[Dict[str, Any]], Dict[str, List[Any]]],
+                         output_file: str, compress: bool = False) -> None:
+    """
+    Generate an HTML report for localization gaps.
+    
+    Args:
+        gaps (Union[List[Dict[str, Any]], Dict[str, List[Any]]]): List of
+            localization gaps, or their 'location', 'text' and 'confidence'
+            columns.
+        output_file (str): Path to the output file.
+        compress (bool): Whether to gzip the report, written to output_file
+            with '.gz' appended.
+    """
+    # Create the directory if it doesn't exist
+    _ensure_directory(output_file)
+    
+    # Take the gaps as (location, text, confidence) rows, so the loops below
+    # unpack tuples instead of looking up dict keys
+    if isinstance(gaps, dict):
+        rows = list(zip(gaps['location'], gaps['text'], gaps['confidence']))
+    else:
+        rows = [(gap['location'], gap['text'], gap['confidence']) for gap in gaps]
+    
+    # Count gaps by location, in the order the locations first appear in the gaps
+    location_counts = Counter(map(_ROW_LOCATION, rows))
+    
+    # Sort gaps by confidence, highest first
+    sorted_rows = sorted(rows, key=_ROW_CONFIDENCE, reverse=True)
+    
+    # Count gaps by confidence, remembering each gap's range for its table row
+    bucket_counts = [0, 0, 0, 0]
+    buckets = []
+    
+    for confidence in map(_ROW_CONFIDENCE, sorted_rows):
+        bucket = _confidence_bucket(confidence)
+        bucket_counts[bucket] += 1
+        buckets.append(bucket)
+    
+    # Draw the confidence bars
+    confidence_bars_svg = _svg_bars([escape(name) for name in _BUCKET_NAMES], bucket_counts)
+    
+    # Draw the location bars
+    top_locations = list(location_counts.items())[:5]
+    location_bars_svg = _svg_bars(
+        [escape(location[:10]) + ('...' if len(location) > 10 else '') for location, _ in top_locations],
+        [count for _, count in top_locations],
+        max(location_counts.values(), default=0)
+    )
+    
+    # Take the time once, so the header and the time stamp agree
+    now = datetime.now()
+    
+    # Generate the HTML report body up to the table rows
+    body_head = f"""
     <body>
         <div class="container">
             <div class="header">
                 <h1>Localization Gap Report</h1>
-                <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                <p>Generated on {now.strftime('%Y-%m-%d %H:%M:%S')}</p>
             </div>
             
             <div class="summary">
                 <div class="summary-box">
                     <h3>Total Gaps</h3>
-                    <p style="font-size: 2em; text-align: center;">{len(gaps)}</p>
+                    <p style="font-size: 2em; text-align: center;">{len(sorted_rows)}</p>
                 </div>
                 <div class="summary-box">
                     <h3>Pages Scanned</h3>
@@ -239,49 +401,22 @@ def generate_html_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
                 </div>
                 <div class="summary-box">
                     <h3>High Confidence Gaps</h3>
-                    <p style="font-size: 2em; text-align: center;">{confidence_ranges['90-100%'] + confidence_ranges['80-90%']}</p>
+                    <p style="font-size: 2em; text-align: center;">{bucket_counts[0] + bucket_counts[1]}</p>
                 </div>
                 <div class="summary-box">
                     <h3>Time Stamp</h3>
-                    <p style="font-size: 1.5em; text-align: center;">{datetime.now().strftime('%H:%M:%S')}</p>
+                    <p style="font-size: 1.5em; text-align: center;">{now.strftime('%H:%M:%S')}</p>
                 </div>
             </div>
             
             <div class="chart">
                 <h3>Gaps by Confidence</h3>
-                <div class="bar-chart">
-                    <div class="bar" style="height: {confidence_ranges['90-100%'] / max(1, max(confidence_ranges.values())) * 100}%;">
-                        <div class="bar-value">{confidence_ranges['90-100%']}</div>
-                        <div class="bar-label">90-100%</div>
-                    </div>
-                    <div class="bar" style="height: {confidence_ranges['80-90%'] / max(1, max(confidence_ranges.values())) * 100}%;">
-                        <div class="bar-value">{confidence_ranges['80-90%']}</div>
-                        <div class="bar-label">80-90%</div>
-                    </div>
-                    <div class="bar" style="height: {confidence_ranges['70-80%'] / max(1, max(confidence_ranges.values())) * 100}%;">
-                        <div class="bar-value">{confidence_ranges['70-80%']}</div>
-                        <div class="bar-label">70-80%</div>
-                    </div>
-                    <div class="bar" style="height: {confidence_ranges['<70%'] / max(1, max(confidence_ranges.values())) * 100}%;">
-                        <div class="bar-value">{confidence_ranges['<70%']}</div>
-                        <div class="bar-label">&lt;70%</div>
-                    </div>
-                </div>
+                {confidence_bars_svg}
             </div>
             
             <div class="chart">
                 <h3>Gaps by Location</h3>
-                <div class="bar-chart">
-                    {
-                    ''.join([
-                        f'''<div class="bar" style="height: {count / max(1, max(location_counts.values())) * 100}%;">
-                            <div class="bar-value">{count}</div>
-                            <div class="bar-label">{location[:10] + ('...' if len(location) > 10 else '')}</div>
-                        </div>'''
-                        for location, count in list(location_counts.items())[:5]
-                    ])
-                    }
-                </div>
+                {location_bars_svg}
             </div>
             
             <table class="table">
@@ -293,35 +428,44 @@ def generate_html_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
                     </tr>
                 </thead>
                 <tbody>
-                    {
-                    ''.join([
-                        f'''<tr>
-                            <td>{gap['location']}</td>
-                            <td>{gap['text']}</td>
-                            <td>
-                                <span class="confidence {'high' if gap['confidence'] >= 0.9 else 'medium' if gap['confidence'] >= 0.8 else 'low' if gap['confidence'] >= 0.7 else 'very-low'}">
-                                    {int(gap['confidence'] * 100)}%
-                                </span>
-                            </td>
-                        </tr>'''
-                        for gap in sorted(gaps, key=lambda x: x['confidence'], reverse=True)
-                    ])
-                    }
-                </tbody>
-            </table>
-            
-            <footer>
-                <p>Localization4 - Localization Gap Detection Tool</p>
-                <p>Generated using Nova Act Lite</p>
-            </footer>
-        </div>
-    </body>
-    </html>
-    """
+                    """
+    
+    # Escape each distinct location once, rather than on every row
+    escaped_locations = {location: escape(location) for location in location_counts}
     
-    # Write the HTML report to a file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # Write the HTML report to a file, streaming the table rows instead of
+    # holding the whole page in memory
+    if compress:
+        report_file = gzip.open(output_file + '.gz', 'wt', encoding='utf-8', compresslevel=3)
+    else:
+        report_file = open(output_file, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE)
+    
+    with report_file as f:
+        write = f.write
+        write(_REPORT_HEAD)
+        write(body_head)
+        for (location, text, confidence), bucket in zip(sorted_rows[:PAGE_SIZE], buckets):
+            write(f'<tr><td>{escaped_locations[location]}</td><td>{escape(text)}</td>'
+                  f'<td><span class="confidence {_BUCKET_CLASSES[bucket]}">{int(confidence * 100)}%</span></td></tr>')
+        write(_TABLE_END)
+        
+        # Embed the rows of the later pages for the pager to render on demand
+        if len(sorted_rows) > PAGE_SIZE:
+            data = {
+                'pageSize': PAGE_SIZE,
+                'classes': _BUCKET_CLASSES,
+                'rows': [
+                    (location, text, int(confidence * 100), bucket)
+                    for (location, text, confidence), bucket
+                    in zip(sorted_rows[PAGE_SIZE:], buckets[PAGE_SIZE:])
+                ]
+            }
+            write(_PAGER_START)
+            # Keep the page text from closing or escaping the script element
+            write(json.dumps(data, ensure_ascii=False).replace('<', '\\u003c'))
+            write(_PAGER_END)
+        
+        write(_REPORT_END)
 
 
 def generate_csv_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
@@ -333,14 +477,96 @@ def generate_csv_report(gaps: List[Dict[str, Any]], output_file: str) -> None:
         output_file (str): Path to the output file.
     """
     # Create the directory if it doesn't exist
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    _ensure_directory(output_file)
     
     # Sort gaps by confidence
-    sorted_gaps = sorted(gaps, key=lambda x: x['confidence'], reverse=True)
+    sorted_gaps = sorted(gaps, key=_CONFIDENCE, reverse=True)
     
     # Write the CSV report
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
         writer = csv.writer(f)
         writer.writerow(['Location', 'Text', 'Confidence'])
-        for gap in sorted_gaps:
-            writer.writerow([gap['location'], gap['text'], f"{int(gap['confidence'] * 100)}%"]) 
\ No newline at end of file
+        writer.writerows(_csv_rows(sorted_gaps))
+
+
+def _csv_rows(gaps: List[Dict[str, Any]]) -> Iterator[Tuple[str, str, str]]:
+    """
+    Format gaps as CSV report rows.
+    
+    Args:
+        gaps (List[Dict[str, Any]]): List of localization gaps.
+        
+    Returns:
+        Iterator[Tuple[str, str, str]]: The location, text and confidence
+            percentage of each gap.
+    """
+    # Format the confidence column in one pass, then pair it with the others
+    percentages = [f"{int(confidence * 100)}%" for confidence in map(_CONFIDENCE, gaps)]
+    return zip(map(_LOCATION, gaps), map(_TEXT, gaps), percentages)
+
+
+class CsvReportWriter:
+    """
+    CSV report writer that adds gaps as they are found, so they do not have to be
+    kept in memory and partial results survive a crash.
+    """
+    
+    def __init__(self, output_file: str):
+        """
+        Create the CSV report and write its header.
+        
+        Args:
+            output_file (str): Path to the output file.
+        """
+        # Create the directory if it doesn't exist
+        _ensure_directory(output_file)
+        
+        self.output_file = output_file
+        self.count = 0
+        self._file = open(output_file, 'w', newline='', encoding='utf-8',
+                          buffering=_WRITE_BUFFER_SIZE)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['Location', 'Text', 'Confidence'])
+    
+    def __enter__(self) -> 'CsvReportWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def write_gaps(self, gaps: List[Dict[str, Any]]) -> None:
+        """
+        Append gaps to the report and flush them to disk.
+        
+        Args:
+            gaps (List[Dict[str, Any]]): List of localization gaps.
+        """
+        self._writer.writerows(_csv_rows(gaps))
+        self._file.flush()
+        self.count += len(gaps)
+    
+    def close(self) -> None:
+        """
+        Close the report file.
+        """
+        self._file.close()
+
+
+def read_csv_report(input_file: str) -> List[Dict[str, Any]]:
+    """
+    Read the gaps back from a CSV report.
+    
+    Args:
+        input_file (str): Path to the CSV report.
+        
+    Returns:
+        List[Dict[str, Any]]: List of localization gaps, with confidences rounded
+            down to the whole percentage stored in the report.
+    """
+    with open(input_file, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip the header
+        return [
+            {'location': location, 'text': text, 'confidence': int(confidence.rstrip('%')) / 100}
+            for location, text, confidence in reader
+        ]